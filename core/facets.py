@@ -0,0 +1,78 @@
+from django.core.cache import cache
+from django.db.models import Count, F, Value
+
+from .models import Category, Hobby, Tag
+
+FACETS_CACHE_KEY = 'home:facets'
+MAX_TAG_FACETS = 30
+# Signals only clear the cache in the worker that made the write; the timeout bounds staleness elsewhere
+FACETS_TIMEOUT = 300
+
+HobbyTag = Hobby.tags.through
+
+
+def filter_hobbies(hobbies, query=None, category_id=None, tag_ids=()):
+    if query:
+        hobbies = hobbies.filter(title__icontains=query)
+    if category_id:
+        hobbies = hobbies.filter(category_id=category_id)
+    if tag_ids:
+        # AND across tags: hobbies that hold every selected tag, grouped on the through table
+        tagged = (HobbyTag.objects.filter(tag_id__in=tag_ids)
+                  .values('hobby_id')
+                  .annotate(n=Count('tag_id'))
+                  .filter(n=len(tag_ids))
+                  .values('hobby_id'))
+        hobbies = hobbies.filter(id__in=tagged)
+    return hobbies
+
+
+def compute_facets(query=None, category_id=None, tag_ids=()):
+    """Category and tag counts for the current search, in one grouped query.
+
+    Category counts ignore the selected category so the other options stay
+    meaningful; tag counts cover the fully filtered set. Selected facets are
+    always listed, with a count of 0 if the search leaves them empty.
+    """
+    without_category = filter_hobbies(Hobby.objects.all(), query, None, tag_ids)
+    filtered = filter_hobbies(without_category, None, category_id)
+    category_counts = (without_category.filter(category__isnull=False)
+                       .values(kind=Value('category'), facet_id=F('category_id'), name=F('category__name'))
+                       .annotate(n=Count('id')))
+    tag_counts = (HobbyTag.objects.filter(hobby__in=filtered.values('id'))
+                  .values(kind=Value('tag'), facet_id=F('tag_id'), name=F('tag__name'))
+                  .annotate(n=Count('hobby_id')))
+    facets = {'categories': [], 'tags': []}
+    for row in category_counts.union(tag_counts, all=True):
+        facets['categories' if row['kind'] == 'category' else 'tags'].append(
+            {'id': row['facet_id'], 'name': row['name'], 'count': row['n']}
+        )
+    _add_missing(facets['categories'], Category, [category_id] if category_id else [])
+    _add_missing(facets['tags'], Tag, tag_ids)
+    facets['categories'].sort(key=lambda f: f['name'].lower())
+    # Selected tags sort first so the cut below never drops them
+    facets['tags'].sort(key=lambda f: (f['id'] not in tag_ids, -f['count'], f['name'].lower()))
+    facets['tags'] = facets['tags'][:MAX_TAG_FACETS]
+    return facets
+
+
+def _add_missing(facets, model, selected_ids):
+    listed = {f['id'] for f in facets}
+    missing = [pk for pk in selected_ids if pk not in listed]
+    if missing:
+        facets.extend({'id': pk, 'name': name, 'count': 0}
+                      for pk, name in model.objects.filter(id__in=missing).values_list('id', 'name'))
+
+
+def get_facets(query=None, category_id=None, tag_ids=()):
+    if query or category_id or tag_ids:
+        return compute_facets(query, category_id, tag_ids)
+    facets = cache.get(FACETS_CACHE_KEY)
+    if facets is None:
+        facets = compute_facets()
+        cache.set(FACETS_CACHE_KEY, facets, timeout=FACETS_TIMEOUT)
+    return facets
+
+
+def invalidate_facets():
+    cache.delete(FACETS_CACHE_KEY)
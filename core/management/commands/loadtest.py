@@ -0,0 +1,257 @@
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection, connections
+from django.test import Client
+from django.urls import reverse
+
+from core.models import Application, Hobby, Profile
+from core.throttle import shed_counts
+
+USER_PREFIX = 'loadtest_'
+DEFAULT_MIX = 'home=6,hobby_detail=4,owner_profile=1,host_summary=1,apply_for_hobby=2,accept_application=1,rate_hobby=1'
+
+
+def _home(user, hobby_ids, users):
+    return 'get', reverse('home'), {}
+
+
+def _hobby_detail(user, hobby_ids, users):
+    return 'get', reverse('hobby_detail', args=[random.choice(hobby_ids)]), {}
+
+
+def _owner_profile(user, hobby_ids, users):
+    return 'get', reverse('owner_profile', args=[random.choice(users).id]), {}
+
+
+def _host_summary(user, hobby_ids, users):
+    return 'get', reverse('host_summary', args=[random.choice(users).username]), {}
+
+
+def _apply_for_hobby(user, hobby_ids, users):
+    return 'get', reverse('apply_for_hobby', args=[random.choice(hobby_ids)]), {}
+
+
+def _accept_application(user, hobby_ids, users):
+    # Host accepting an applicant goes through the hobby_detail POST handler
+    app = Application.objects.filter(hobby__host=user, status='pending').values_list('id', 'hobby_id').first()
+    if not app:
+        return _hobby_detail(user, hobby_ids, users)
+    return 'post', reverse('hobby_detail', args=[app[1]]), {'app_id': app[0], 'action': 'accept'}
+
+
+def _rate_hobby(user, hobby_ids, users):
+    return 'post', reverse('rate_hobby', args=[random.choice(hobby_ids)]), {'score': random.randint(1, 5)}
+
+
+ROUTES = {
+    'home': _home,
+    'hobby_detail': _hobby_detail,
+    'owner_profile': _owner_profile,
+    'host_summary': _host_summary,
+    'apply_for_hobby': _apply_for_hobby,
+    'accept_application': _accept_application,
+    'rate_hobby': _rate_hobby,
+}
+
+
+def is_locked(exc):
+    # "database is locked" for file databases, "database table is locked" for shared in-memory ones
+    return 'is locked' in str(exc)
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0
+    index = max(0, int(round(pct / 100 * len(sorted_values))) - 1)
+    return sorted_values[index]
+
+
+class Command(BaseCommand):
+    help = 'Drive a mix of read/write routes from many threads and report throughput, latency and SQLite lock errors.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument('--requests', type=int, default=200, help='Requests per thread.')
+        parser.add_argument('--users', type=int, default=20, help='Synthetic users to seed (each hosts one hobby).')
+        parser.add_argument('--mix', default=DEFAULT_MIX, help='Comma separated route=weight pairs. Routes: ' + ', '.join(ROUTES))
+        parser.add_argument('--retries', type=int, default=3, help='Retries for a request that hits "database is locked".')
+        parser.add_argument('--no-throttle', action='store_true', help='Disable the write-endpoint throttles for the run.')
+        parser.add_argument('--seed', type=int, default=None, help='Random seed for a repeatable route sequence.')
+        parser.add_argument('--database', default=None,
+                            help='SQLite file to run against (never the default database). Defaults to a temporary file removed afterwards.')
+        parser.add_argument('--copy-default', action='store_true',
+                            help='Start from a copy of the default database instead of an empty migrated one.')
+        parser.add_argument('--cleanup', action='store_true', help='Delete the seeded loadtest_* users and their data afterwards.')
+
+    def handle(self, *args, **options):
+        mix = self.parse_mix(options['mix'])
+        if options['seed'] is not None:
+            random.seed(options['seed'])
+        if options['no_throttle']:
+            settings.THROTTLE_ENABLED = False
+
+        temp_dir = None
+        path = options['database']
+        if path is None:
+            temp_dir = tempfile.mkdtemp(prefix='loadtest-')
+            path = os.path.join(temp_dir, 'loadtest.sqlite3')
+        default = connections['default'].settings_dict
+        original_name = default['NAME']
+        try:
+            self.use_database(path, options['copy_default'])
+            self.run(mix, options)
+        finally:
+            connection.close()
+            default['NAME'] = original_name
+            if temp_dir:
+                shutil.rmtree(temp_dir, ignore_errors=True)
+
+    def use_database(self, path, copy_default):
+        default = connections['default'].settings_dict
+        if default['ENGINE'] != 'django.db.backends.sqlite3':
+            raise CommandError('loadtest only supports SQLite databases.')
+        if Path(path).resolve() == Path(default['NAME']).resolve():
+            raise CommandError('Refusing to run against the default database; pass a different --database file.')
+        if copy_default:
+            shutil.copyfile(default['NAME'], path)
+        # Every thread opens its connection from this settings dict
+        connection.close()
+        default['NAME'] = path
+        call_command('migrate', interactive=False, verbosity=0)
+        self.stdout.write(f'Using database {path}')
+
+    def run(self, mix, options):
+        users = self.seed(options['users'])
+        hobby_ids = list(Hobby.objects.filter(host__in=users).values_list('id', flat=True))
+
+        self.results = defaultdict(list)
+        self.counts = defaultdict(lambda: defaultdict(int))
+        self.lock = threading.Lock()
+
+        threads = [
+            threading.Thread(
+                target=self.worker,
+                args=(users[i % len(users)], mix, hobby_ids, users, options['requests'], options['retries'], i),
+            )
+            for i in range(options['threads'])
+        ]
+        started = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - started
+
+        self.report(elapsed, mix)
+        if options['cleanup']:
+            # Cascades to the seeded hobbies, applications and ratings
+            User.objects.filter(username__startswith=USER_PREFIX).delete()
+
+    def parse_mix(self, value):
+        mix = {}
+        for part in value.split(','):
+            name, _, weight = part.partition('=')
+            name = name.strip()
+            if name not in ROUTES:
+                raise CommandError(f'Unknown route "{name}". Choose from: {", ".join(ROUTES)}')
+            mix[name] = int(weight or 1)
+        return mix
+
+    def seed(self, count):
+        users = []
+        for i in range(count):
+            user, created = User.objects.get_or_create(username=f'{USER_PREFIX}{i}')
+            if created:
+                user.set_unusable_password()
+                user.save()
+                Profile.objects.create(user=user)
+            Hobby.objects.get_or_create(
+                host=user, title=f'Load test hobby {i}',
+                defaults={'description': 'Seeded by the loadtest command.', 'max_participants': count},
+            )
+            users.append(user)
+        return users
+
+    def worker(self, user, mix, hobby_ids, users, n_requests, retries, index):
+        client = Client(SERVER_NAME='localhost', REMOTE_ADDR=f'10.0.{index // 256}.{index % 256}')
+        for attempt in range(retries + 1):
+            try:
+                client.force_login(user)
+                break
+            except OperationalError as exc:
+                if not is_locked(exc) or attempt == retries:
+                    raise
+                time.sleep(0.01 * (attempt + 1))
+        names = list(mix)
+        weights = [mix[name] for name in names]
+        try:
+            for _ in range(n_requests):
+                name = random.choices(names, weights)[0]
+                self.run_one(client, user, name, hobby_ids, users, retries)
+        finally:
+            connection.close()
+
+    def run_one(self, client, user, name, hobby_ids, users, retries):
+        for attempt in range(retries + 1):
+            try:
+                method, url, data = ROUTES[name](user, hobby_ids, users)
+                started = time.perf_counter()
+                response = getattr(client, method)(url, data)
+                took = time.perf_counter() - started
+            except OperationalError as exc:
+                if not is_locked(exc):
+                    with self.lock:
+                        self.counts[name]['errors'] += 1
+                    return
+                with self.lock:
+                    self.counts[name]['locked'] += 1
+                    if attempt < retries:
+                        self.counts[name]['retries'] += 1
+                time.sleep(0.01 * (attempt + 1))
+                continue
+            except Exception:
+                with self.lock:
+                    self.counts[name]['errors'] += 1
+                return
+            with self.lock:
+                self.results[name].append(took)
+                if response.status_code == 429:
+                    self.counts[name]['throttled'] += 1
+                elif response.status_code >= 400:
+                    self.counts[name]['errors'] += 1
+            return
+        with self.lock:
+            self.counts[name]['failed'] += 1
+
+    def report(self, elapsed, mix):
+        header = f"{'route':<20}{'count':>7}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'locked':>8}{'retries':>9}{'failed':>8}{'429':>6}{'errors':>8}"
+        self.stdout.write(header)
+        self.stdout.write('-' * len(header))
+        for name in mix:
+            timings = sorted(self.results[name])
+            counts = self.counts[name]
+            self.stdout.write(
+                f'{name:<20}{len(timings):>7}{len(timings) / elapsed:>9.1f}'
+                f'{percentile(timings, 50) * 1000:>9.1f}{percentile(timings, 95) * 1000:>9.1f}{percentile(timings, 99) * 1000:>9.1f}'
+                f"{counts['locked']:>8}{counts['retries']:>9}{counts['failed']:>8}{counts['throttled']:>6}{counts['errors']:>8}"
+            )
+        total = sum(len(v) for v in self.results.values())
+        locked = sum(c['locked'] for c in self.counts.values())
+        retried = sum(c['retries'] for c in self.counts.values())
+        self.stdout.write('-' * len(header))
+        self.stdout.write(f'{total} requests in {elapsed:.2f}s ({total / elapsed:.1f} req/s), '
+                          f'{locked} "database is locked" errors, {retried} retries')
+        shed = {scope: n for scope, n in shed_counts().items() if n}
+        if shed:
+            self.stdout.write(f'Throttle shed: {shed}')
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.5 on 2026-10-19 06:48
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('core', '0003_hobby_date_hobby_place'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Requirement',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='UserRequirement',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hobby', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.hobby')),
+                ('requirement', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.requirement')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='hobby',
+            name='requirements',
+            field=models.ManyToManyField(blank=True, to='core.requirement'),
+        ),
+    ]
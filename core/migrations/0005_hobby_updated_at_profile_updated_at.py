@@ -0,0 +1,23 @@
+# Generated by Django 4.2.5 on 2026-10-19 06:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_requirement_userrequirement_hobby_requirements'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='hobby',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
@@ -1,12 +1,14 @@
 from django.db import models
 from django.contrib.auth.models import User
 from django.db.models import Avg
+from django.utils import timezone
 
 class Profile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE)
     bio = models.TextField(blank=True)
     goal = models.CharField(max_length=255, blank=True)
     image = models.ImageField(upload_to='profile_images/', blank=True, null=True)  # New field
+    updated_at = models.DateTimeField(auto_now=True)  # Also bumped when the user's hobbies change
 
     def __str__(self):
         return self.user.username
@@ -45,6 +47,7 @@ class Hobby(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     date = models.DateTimeField(null=True, blank=True)  # <-- Add this line
     place = models.CharField(max_length=255, blank=True)  # <-- Add this line
+    updated_at = models.DateTimeField(auto_now=True)  # Also bumped on application, rating and tag changes
 
     def __str__(self):
         return self.title
@@ -87,4 +90,10 @@ class ParticipantRating(models.Model):
 class UserRequirement(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     hobby = models.ForeignKey(Hobby, on_delete=models.CASCADE)
-    requirement = models.ForeignKey(Requirement, on_delete=models.CASCADE)
\ No newline at end of file
+    requirement = models.ForeignKey(Requirement, on_delete=models.CASCADE)
+
+def touch_hobby(hobby_id):
+    """Bump the version stamps of a hobby and its host's profile without loading them."""
+    now = timezone.now()
+    Hobby.objects.filter(id=hobby_id).update(updated_at=now)
+    Profile.objects.filter(user__hosted_hobbies=hobby_id).update(updated_at=now)
@@ -0,0 +1,64 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .facets import invalidate_facets
+from .models import Application, Category, Hobby, ParticipantRating, Profile, Rating, Tag, touch_hobby
+
+
+@receiver(post_save, sender=Application)
+@receiver(post_delete, sender=Application)
+@receiver(post_save, sender=Rating)
+@receiver(post_delete, sender=Rating)
+@receiver(post_save, sender=ParticipantRating)
+@receiver(post_delete, sender=ParticipantRating)
+def touch_hobby_on_change(sender, instance, **kwargs):
+    touch_hobby(instance.hobby_id)
+
+
+@receiver(m2m_changed, sender=Hobby.tags.through)
+def touch_hobby_on_tags_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == 'pre_clear' and reverse:
+        # post_clear carries no pk_set, so remember the tag's hobbies while they are still linked
+        instance._cleared_hobby_ids = list(instance.hobby_set.values_list('id', flat=True))
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    invalidate_facets()
+    if not reverse:
+        touch_hobby(instance.id)
+    else:
+        hobby_ids = pk_set if action != 'post_clear' else getattr(instance, '_cleared_hobby_ids', [])
+        for hobby_id in hobby_ids:
+            touch_hobby(hobby_id)
+
+
+@receiver(post_save, sender=Tag)
+@receiver(pre_delete, sender=Tag)
+def touch_tagged_hobbies(sender, instance, **kwargs):
+    # hobby_detail shows tag names; deleting a tag cascades the links without m2m_changed
+    Hobby.objects.filter(tags=instance).update(updated_at=timezone.now())
+
+
+@receiver(post_save, sender=Category)
+@receiver(pre_delete, sender=Category)
+def touch_category_hobbies(sender, instance, **kwargs):
+    # hobby_detail shows the category name; SET_NULL on delete does not touch updated_at
+    Hobby.objects.filter(category=instance).update(updated_at=timezone.now())
+
+
+@receiver(post_save, sender=Hobby)
+@receiver(post_delete, sender=Hobby)
+def touch_host_profile(sender, instance, **kwargs):
+    # owner_profile and host_summary list the host's hobbies
+    Profile.objects.filter(user_id=instance.host_id).update(updated_at=timezone.now())
+
+
+@receiver(post_save, sender=Hobby)
+@receiver(post_delete, sender=Hobby)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def invalidate_home_facets(sender, **kwargs):
+    invalidate_facets()
@@ -1,3 +1,252 @@
-from django.test import TestCase
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from . import facets
+from .models import Application, Category, Hobby, ParticipantRating, Profile, Rating, Tag
+from .throttle import shed_counts
+
+
+class HobbyTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.host = User.objects.create_user('host', password='pass')
+        self.guest = User.objects.create_user('guest', password='pass')
+        self.other = User.objects.create_user('other', password='pass')
+        for user in (self.host, self.guest, self.other):
+            Profile.objects.create(user=user)
+        self.hobby = Hobby.objects.create(host=self.host, title='Climbing', description='Bouldering night')
+
+
+class RatingTests(HobbyTestCase):
+    def test_rate_hobby_upserts_one_row(self):
+        self.client.force_login(self.guest)
+        url = reverse('rate_hobby', args=[self.hobby.id])
+        self.client.post(url, {'score': '3'})
+        self.client.post(url, {'score': '5'})
+        self.client.post(url, {'score': '9'})
+        self.assertEqual(list(Rating.objects.values_list('rater', 'score')), [(self.guest.id, 5)])
+
+    def test_rate_participants_only_rates_accepted(self):
+        Application.objects.create(hobby=self.hobby, applicant=self.guest, status='accepted')
+        Application.objects.create(hobby=self.hobby, applicant=self.other, status='pending')
+        self.client.force_login(self.host)
+        url = reverse('rate_participants', args=[self.hobby.id])
+        self.client.post(url, {f'score_{self.guest.id}': '4', f'score_{self.other.id}': '5'})
+        self.client.post(url, {f'score_{self.guest.id}': '2'})
+        self.assertEqual(
+            list(ParticipantRating.objects.values_list('participant', 'host', 'score')),
+            [(self.guest.id, self.host.id, 2)],
+        )
+
+    def test_rate_participants_skips_malformed_keys(self):
+        Application.objects.create(hobby=self.hobby, applicant=self.guest, status='accepted')
+        self.client.force_login(self.host)
+        response = self.client.post(reverse('rate_participants', args=[self.hobby.id]), {
+            'score_\u00b2': '3', 'score_99999999999999999999': '3', 'score_': '3', f'score_{self.guest.id}': '4',
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(list(ParticipantRating.objects.values_list('participant', 'score')), [(self.guest.id, 4)])
+
+    def test_rate_participants_requires_host(self):
+        Application.objects.create(hobby=self.hobby, applicant=self.guest, status='accepted')
+        self.client.force_login(self.other)
+        response = self.client.post(reverse('rate_participants', args=[self.hobby.id]), {f'score_{self.guest.id}': '4'})
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(ParticipantRating.objects.exists())
+
+
+class ThrottleTests(HobbyTestCase):
+    def setUp(self):
+        super().setUp()
+        # Keep every request in the same throttle window
+        patcher = mock.patch('core.throttle.time.time', return_value=1_000_000.0)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_signup_form_loads_are_not_throttled(self):
+        for _ in range(10):
+            self.assertEqual(self.client.get(reverse('signup')).status_code, 200)
+
+    def test_signup_posts_are_throttled_and_counted(self):
+        codes = [self.client.post(reverse('signup'), {}).status_code for _ in range(7)]
+        self.assertEqual(codes, [200] * 5 + [429] * 2)
+        self.assertEqual(shed_counts(['signup']), {'signup': 2})
+
+    def test_rejected_request_does_no_queries(self):
+        for _ in range(5):
+            self.client.post(reverse('signup'), {})
+        with self.assertNumQueries(0):
+            response = self.client.post(reverse('signup'), {})
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('Retry-After', response)
+
+    def test_user_bucket_rejects_without_queries(self):
+        self.client.force_login(self.guest)
+        url = reverse('rate_hobby', args=[self.hobby.id])
+        # A new address every request, so only the per-user bucket can trip
+        for i in range(20):
+            self.client.post(url, {'score': '3'}, REMOTE_ADDR=f'10.0.0.{i}')
+        with self.assertNumQueries(0):
+            response = self.client.post(url, {'score': '3'}, REMOTE_ADDR='10.0.1.1')
+        self.assertEqual(response.status_code, 429)
+
+    def test_apply_is_throttled_on_get(self):
+        Hobby.objects.create(host=self.guest, title='Chess', description='Blitz')
+        self.client.force_login(self.guest)
+        url = reverse('apply_for_hobby', args=[self.hobby.id])
+        codes = [self.client.get(url).status_code for _ in range(21)]
+        self.assertEqual(codes[-1], 429)
+        self.assertEqual(codes.count(429), 1)
+
+
+class ConditionalGetTests(HobbyTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.guest)
+        self.url = reverse('hobby_detail', args=[self.hobby.id])
+
+    def revalidate(self, url=None):
+        url = url or self.url
+        etag = self.client.get(url)['ETag']
+        return lambda: self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code
+
+    def test_unchanged_pages_return_304(self):
+        for url in (self.url, reverse('owner_profile', args=[self.host.id]), reverse('host_summary', args=['host'])):
+            self.assertEqual(self.revalidate(url)(), 304)
+
+    def test_application_change_invalidates(self):
+        status = self.revalidate()
+        Application.objects.create(hobby=self.hobby, applicant=self.other)
+        self.assertEqual(status(), 200)
+
+    def test_rating_upsert_invalidates(self):
+        status = self.revalidate()
+        owner_status = self.revalidate(reverse('owner_profile', args=[self.host.id]))
+        self.client.post(reverse('rate_hobby', args=[self.hobby.id]), {'score': '4'})
+        self.assertEqual(status(), 200)
+        self.assertEqual(owner_status(), 200)
+
+    def test_tag_change_invalidates(self):
+        status = self.revalidate()
+        self.hobby.tags.add(Tag.objects.create(name='outdoor'))
+        self.assertEqual(status(), 200)
+
+    def test_tag_rename_and_delete_invalidate(self):
+        tag = Tag.objects.create(name='outdoor')
+        self.hobby.tags.add(tag)
+        status = self.revalidate()
+        tag.name = 'outside'
+        tag.save()
+        self.assertEqual(status(), 200)
+        status = self.revalidate()
+        tag.delete()
+        self.assertEqual(status(), 200)
+
+    def test_reverse_tag_clear_invalidates(self):
+        tag = Tag.objects.create(name='outdoor')
+        self.hobby.tags.add(tag)
+        status = self.revalidate()
+        tag.hobby_set.clear()
+        self.assertEqual(status(), 200)
+
+    def test_category_rename_invalidates(self):
+        self.hobby.category = Category.objects.create(name='Sport')
+        self.hobby.save()
+        status = self.revalidate()
+        self.hobby.category.name = 'Sports'
+        self.hobby.category.save()
+        self.assertEqual(status(), 200)
+
+    def test_event_date_passing_invalidates(self):
+        Hobby.objects.filter(id=self.hobby.id).update(date=timezone.now() + timedelta(hours=1))
+        status = self.revalidate()
+        with mock.patch('django.utils.timezone.now', return_value=timezone.now() + timedelta(hours=2)):
+            self.assertEqual(status(), 200)
+
+    def test_login_rotation_invalidates(self):
+        def log_in():
+            self.client.get(reverse('login'))
+            self.client.post(reverse('login'), {
+                'username': 'guest', 'password': 'pass',
+                'csrfmiddlewaretoken': self.client.cookies['csrftoken'].value,
+            })
+
+        self.client = Client(enforce_csrf_checks=True)
+        log_in()
+        status = self.revalidate()
+        self.client.logout()
+        log_in()
+        self.assertEqual(status(), 200)
+
+
+class FacetTests(HobbyTestCase):
+    def setUp(self):
+        super().setUp()
+        self.sport = Category.objects.create(name='Sport')
+        self.music = Category.objects.create(name='Music')
+        self.outdoor = Tag.objects.create(name='outdoor')
+        self.free = Tag.objects.create(name='free')
+        self.hobby.category = self.sport
+        self.hobby.save()
+        self.hobby.tags.add(self.outdoor, self.free)
+        self.run = Hobby.objects.create(host=self.host, title='Running', description='5k', category=self.sport)
+        self.run.tags.add(self.free)
+        self.choir = Hobby.objects.create(host=self.host, title='Choir', description='Sing', category=self.music)
+
+    def counts(self, facet_list):
+        return {f['name']: f['count'] for f in facet_list}
+
+    def test_and_tag_filtering(self):
+        response = self.client.get(reverse('home'), {'tag': [self.outdoor.id, self.free.id]})
+        self.assertEqual([h.title for h in response.context['hobbies']], ['Climbing'])
+        response = self.client.get(reverse('home'), {'tag': [self.free.id]})
+        self.assertEqual({h.title for h in response.context['hobbies']}, {'Climbing', 'Running'})
+
+    def test_malformed_filters_are_ignored(self):
+        for params in ({'tag': '\u00b2'}, {'category': '\u00b2'}, {'tag': '99999999999999999999'},
+                       {'category': '99999999999999999999'}, {'tag': ['x', str(self.outdoor.id)]}):
+            response = self.client.get(reverse('home'), params)
+            self.assertEqual(response.status_code, 200)
+        self.assertEqual([h.title for h in response.context['hobbies']], ['Climbing'])
+
+    def test_counts_follow_search(self):
+        self.assertEqual(self.counts(facets.get_facets()['categories']), {'Sport': 2, 'Music': 1})
+        self.assertEqual(self.counts(facets.get_facets()['tags']), {'free': 2, 'outdoor': 1})
+        filtered = facets.get_facets(query='run')
+        self.assertEqual(self.counts(filtered['categories']), {'Sport': 1})
+        self.assertEqual(self.counts(filtered['tags']), {'free': 1})
+
+    def test_filtered_facets_use_one_query(self):
+        with self.assertNumQueries(1):
+            facets.get_facets(category_id=self.sport.id, tag_ids=[self.free.id])
+
+    def test_selected_facets_always_listed(self):
+        response = self.client.get(reverse('home'), {'category': self.music.id, 'tag': [self.outdoor.id]})
+        self.assertEqual(self.counts(response.context['categories'])['Music'], 0)
+        self.assertEqual(self.counts(response.context['tag_facets']), {'outdoor': 0})
+        self.assertContains(response, f'<option value="{self.music.id}" selected>')
+
+    def test_selected_tags_survive_cut(self):
+        for i in range(facets.MAX_TAG_FACETS + 5):
+            self.run.tags.add(Tag.objects.create(name=f'tag{i:02d}'))
+        last = Tag.objects.create(name='zzz')
+        self.run.tags.add(last)
+        # Every tag on Running ties at count 1, so 'zzz' would sort past the cut
+        tags = facets.get_facets(tag_ids=[last.id])['tags']
+        self.assertEqual(len(tags), facets.MAX_TAG_FACETS)
+        self.assertEqual(tags[0]['id'], last.id)
+
+    def test_unfiltered_facets_cached_and_invalidated(self):
+        facets.get_facets()
+        with self.assertNumQueries(0):
+            facets.get_facets()
+        self.choir.tags.add(self.free)
+        self.assertEqual(self.counts(facets.get_facets()['tags'])['free'], 3)
+        Hobby.objects.create(host=self.host, title='Jazz', description='Band', category=self.music)
+        self.assertEqual(self.counts(facets.get_facets()['categories'])['Music'], 2)
@@ -0,0 +1,83 @@
+import hashlib
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+SHED_KEY = 'throttle:shed:{}'
+SCOPES = []
+
+
+def parse_rate(rate):
+    """Turn '10/m' into (10, 60)."""
+    num, period = rate.split('/')
+    return int(num), PERIODS[period[0]]
+
+
+def _take(bucket, limit, period):
+    # Each bucket holds `limit` tokens and refills at the start of every period.
+    # cache.add + cache.incr keeps it to atomic increments, no read-modify-write.
+    window = int(time.time() // period)
+    key = f'throttle:{bucket}:{window}'
+    cache.add(key, 0, timeout=period)
+    try:
+        used = cache.incr(key)
+    except ValueError:
+        # Key expired between add and incr
+        cache.add(key, 1, timeout=period)
+        used = 1
+    return used <= limit, period - int(time.time()) % period
+
+
+def _record_shed(scope):
+    key = SHED_KEY.format(scope)
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        pass
+
+
+def shed_counts(scopes=None):
+    """How many requests were rejected with 429, per throttle scope."""
+    if scopes is None:
+        scopes = SCOPES
+    return {scope: cache.get(SHED_KEY.format(scope), 0) for scope in scopes}
+
+
+def throttle(scope, rate, methods=('POST',)):
+    """Limit a view to `rate` requests per client IP and per logged-in user.
+
+    Only requests whose method is in `methods` use up a token, so loading a
+    form is free; views that write on GET have to opt in explicitly.
+
+    Runs before the view so a rejected request costs no ORM work: the user
+    bucket keys on a hash of the raw session cookie, so neither the session
+    nor the User is loaded.
+    """
+    limit, period = parse_rate(rate)
+    if scope not in SCOPES:
+        SCOPES.append(scope)
+
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in methods or not getattr(settings, 'THROTTLE_ENABLED', True):
+                return view_func(request, *args, **kwargs)
+            allowed, retry_after = _take(f"{scope}:ip:{request.META.get('REMOTE_ADDR', '')}", limit, period)
+            if allowed:
+                session_cookie = request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+                if session_cookie:
+                    session_hash = hashlib.sha256(session_cookie.encode()).hexdigest()[:32]
+                    allowed, retry_after = _take(f'{scope}:user:{session_hash}', limit, period)
+            if not allowed:
+                _record_shed(scope)
+                response = HttpResponse('Too many requests, please slow down.', status=429)
+                response['Retry-After'] = str(retry_after)
+                return response
+            return view_func(request, *args, **kwargs)
+        return wrapper
+    return decorator
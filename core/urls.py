@@ -2,16 +2,18 @@
 from django.urls import path
 from django.contrib.auth import views as auth_views
 from . import views
+from .throttle import throttle
 
 urlpatterns = [
     path('', views.home, name='home'),
     path('hobby/<int:hobby_id>/', views.hobby_detail, name='hobby_detail'),
-    path('hobby/new/', views.create_hobby, name='create_hobby'),
-    path('hobby/<int:hobby_id>/apply/', views.apply_for_hobby, name='apply_for_hobby'),
+    path('hobby/new/', throttle('create_hobby', '10/m')(views.create_hobby), name='create_hobby'),
+    path('hobby/<int:hobby_id>/apply/', throttle('apply_for_hobby', '20/m', methods=('GET', 'POST'))(views.apply_for_hobby), name='apply_for_hobby'),
     path('application/<int:app_id>/<str:status>/', views.manage_application, name='manage_application'),
-    path('hobby/<int:hobby_id>/rate/', views.rate_hobby, name='rate_hobby'),
+    path('hobby/<int:hobby_id>/rate/', throttle('rate_hobby', '20/m')(views.rate_hobby), name='rate_hobby'),
+    path('hobby/<int:hobby_id>/rate-participants/', throttle('rate_participants', '20/m')(views.rate_participants), name='rate_participants'),
     
-    path('signup/', views.signup, name='signup'),
+    path('signup/', throttle('signup', '5/m')(views.signup), name='signup'),
     path('login/', auth_views.LoginView.as_view(template_name='registration/login.html'), name='login'),
     path('logout/', auth_views.LogoutView.as_view(next_page='home'), name='logout'),
     path('profile/', views.user_profile, name='profile'),
@@ -3,26 +3,85 @@ from django.contrib.auth import login
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth.models import User
-from .models import Hobby, Category, Application, Profile, Rating, ParticipantRating, Tag, Requirement, UserRequirement
+from .models import Hobby, Category, Application, Profile, Rating, ParticipantRating, Tag, Requirement, UserRequirement, touch_hobby
 from .forms import HobbyForm, ProfileForm
+from .facets import filter_hobbies, get_facets
+import hashlib
+from django.conf import settings
+from django.contrib.auth import SESSION_KEY
 from django.db.models import Count
 from django.utils import timezone
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
+
+def _stamp(request, queryset):
+    # One indexed lookup per request, shared by the ETag and Last-Modified checks
+    if not hasattr(request, '_version_stamp'):
+        request._version_stamp = queryset.values_list('updated_at', flat=True).first()
+    return request._version_stamp
+
+def _etag(updated_at, request, *extra):
+    # Pages differ per viewer (host controls, application status, nav links), and
+    # their CSRF tokens go stale when login rotates the CSRF secret
+    if updated_at is None:
+        return None
+    csrf = hashlib.sha256(request.COOKIES.get(settings.CSRF_COOKIE_NAME, '').encode()).hexdigest()[:16]
+    return '-'.join([str(updated_at.timestamp()), str(request.session.get(SESSION_KEY, 'anon')), csrf, *map(str, extra)])
+
+def _hobby_stamp(request, hobby_id):
+    # The rating forms appear once hobby.date passes, so that moment counts as a change
+    if not hasattr(request, '_version_stamp'):
+        request._version_stamp = None
+        row = Hobby.objects.filter(id=hobby_id).values_list('updated_at', 'date').first()
+        if row:
+            updated_at, date = row
+            request._can_rate = not date or date <= timezone.now()
+            request._version_stamp = max(updated_at, date) if date and request._can_rate else updated_at
+    return request._version_stamp
+
+def _hobby_etag(request, hobby_id):
+    stamp = _hobby_stamp(request, hobby_id)
+    return _etag(stamp, request, int(request._can_rate)) if stamp else None
+
+def _owner_stamp(request, user_id):
+    return _stamp(request, Profile.objects.filter(user_id=user_id))
+
+def _host_stamp(request, username):
+    return _stamp(request, Profile.objects.filter(user__username=username))
+
+MAX_ID = 2 ** 63 - 1  # SQLite INTEGER range
+
+def _parse_id(value):
+    if not value or not value.isdecimal():
+        return None
+    try:
+        pk = int(value)
+    except ValueError:
+        return None
+    return pk if 0 < pk <= MAX_ID else None
 
 def home(request):
     query = request.GET.get('q')
-    category_id = request.GET.get('category')
+    category_id = _parse_id(request.GET.get('category'))
+    tag_ids = sorted({pk for pk in map(_parse_id, request.GET.getlist('tag')) if pk})
     hobbies = Hobby.objects.all().annotate(host_hobby_count=Count('host__hosted_hobbies')).order_by('-created_at')
+    hobbies = filter_hobbies(hobbies, query, category_id, tag_ids)
 
-    if query:
-        hobbies = hobbies.filter(title__icontains=query)
-    if category_id:
-        hobbies = hobbies.filter(category_id=category_id)
-
-    categories = Category.objects.all()
-    context = {'hobbies': hobbies, 'categories': categories}
+    facets = get_facets(query, category_id, tag_ids)
+    context = {
+        'hobbies': hobbies,
+        'categories': facets['categories'],
+        'tag_facets': facets['tags'],
+        'selected_tags': tag_ids,
+    }
     return render(request, 'home.html', context)
 
 @login_required(login_url='login')
+@cache_control(private=True, no_cache=True)
+@condition(
+    etag_func=_hobby_etag,
+    last_modified_func=_hobby_stamp,
+)
 def hobby_detail(request, hobby_id):
     hobby = get_object_or_404(Hobby, id=hobby_id)
     is_host = request.user == hobby.host
@@ -46,12 +105,14 @@ def hobby_detail(request, hobby_id):
                 application.delete()  # Remove the participant from the event
 
     applications = hobby.applications.all() if is_host else None
+    can_rate = not hobby.date or hobby.date <= timezone.now()
 
     context = {
         'hobby': hobby,
         'is_host': is_host,
         'user_application': user_application,
         'applications': applications,
+        'can_rate': can_rate,
     }
     return render(request, 'hobby_detail.html', context)
 
@@ -122,11 +183,16 @@ def rate_hobby(request, hobby_id):
     if hobby.date and hobby.date > timezone.now():
         return redirect('hobby_detail', hobby_id=hobby.id)  # Don't allow rating before event ends
     if request.method == 'POST':
-        score = request.POST.get('score')
+        score = _parse_score(request.POST.get('score'))
         if score:
-            Rating.objects.update_or_create(
-                hobby=hobby, rater=request.user, defaults={'score': score}
+            # Single INSERT ... ON CONFLICT DO UPDATE instead of SELECT + INSERT/UPDATE
+            Rating.objects.bulk_create(
+                [Rating(hobby=hobby, rater=request.user, score=score)],
+                update_conflicts=True,
+                unique_fields=['hobby', 'rater'],
+                update_fields=['score'],
             )
+            touch_hobby(hobby.id)  # bulk_create sends no post_save
     return redirect('hobby_detail', hobby_id=hobby.id)
 
 @login_required
@@ -136,13 +202,55 @@ def rate_participant(request, hobby_id, participant_id):
     if hobby.date and hobby.date > timezone.now():
         return redirect('hobby_detail', hobby_id=hobby.id)
     if request.method == 'POST':
-        score = request.POST.get('score')
+        score = _parse_score(request.POST.get('score'))
         if score:
-            ParticipantRating.objects.update_or_create(
-                hobby=hobby, participant=participant, host=request.user, defaults={'score': score}
-            )
+            _upsert_participant_ratings(hobby, request.user, {participant.id: score})
     return redirect('hobby_detail', hobby_id=hobby.id)
 
+@login_required
+def rate_participants(request, hobby_id):
+    hobby = get_object_or_404(Hobby, id=hobby_id, host=request.user)
+    if hobby.date and hobby.date > timezone.now():
+        return redirect('hobby_detail', hobby_id=hobby.id)
+    if request.method == 'POST':
+        # Form fields look like score_<participant_id>=<1..5>
+        scores = {}
+        for key, value in request.POST.items():
+            participant_id = _parse_id(key[len('score_'):]) if key.startswith('score_') else None
+            score = _parse_score(value)
+            if participant_id and score:
+                scores[participant_id] = score
+        if scores:
+            # Only accepted participants of this hobby can be rated, checked in one query
+            accepted_ids = set(hobby.applications.filter(
+                status='accepted', applicant_id__in=scores.keys()
+            ).values_list('applicant_id', flat=True))
+            scores = {pid: score for pid, score in scores.items() if pid in accepted_ids}
+            _upsert_participant_ratings(hobby, request.user, scores)
+    return redirect('hobby_detail', hobby_id=hobby.id)
+
+def _parse_score(value):
+    try:
+        score = int(value)
+    except (TypeError, ValueError):
+        return None
+    return score if 1 <= score <= 5 else None
+
+def _upsert_participant_ratings(hobby, host, scores):
+    """Write {participant_id: score} for a hobby in a single INSERT ... ON CONFLICT DO UPDATE."""
+    if not scores:
+        return
+    ParticipantRating.objects.bulk_create(
+        [
+            ParticipantRating(hobby=hobby, participant_id=participant_id, host=host, score=score)
+            for participant_id, score in scores.items()
+        ],
+        update_conflicts=True,
+        unique_fields=['hobby', 'participant'],
+        update_fields=['host', 'score'],
+    )
+    touch_hobby(hobby.id)  # bulk_create sends no post_save
+
 
 def signup(request):
     if request.method == 'POST':
@@ -175,6 +283,11 @@ def user_profile(request):
     }
     return render(request, 'profile.html', context)
 
+@cache_control(private=True, no_cache=True)
+@condition(
+    etag_func=lambda request, user_id: _etag(_owner_stamp(request, user_id), request),
+    last_modified_func=_owner_stamp,
+)
 def owner_profile(request, user_id):
     owner = get_object_or_404(User, id=user_id)
     profile = Profile.objects.filter(user=owner).first()
@@ -203,6 +316,11 @@ def profile(request, username):
     # Add any extra context you need, e.g. hobbies, reviews, etc.
     return render(request, 'profile.html', {'profile_user': user})
 
+@cache_control(private=True, no_cache=True)
+@condition(
+    etag_func=lambda request, username: _etag(_host_stamp(request, username), request),
+    last_modified_func=_host_stamp,
+)
 def host_summary(request, username):
     user = get_object_or_404(User, username=username)
     from .models import Hobby, Profile  # Import your models
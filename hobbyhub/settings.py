@@ -83,6 +83,21 @@ DATABASES = {
 }
 
 
+# Cache (backs the write-endpoint throttles in core/throttle.py
+# and the home page facet counts in core/facets.py).
+# LocMemCache is per process: with several workers each one keeps its own
+# throttle buckets, multiplying the limits, and facet invalidation only reaches
+# the worker that made the write. Use a shared backend (file, DB or Redis) in
+# production.
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 